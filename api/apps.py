@@ -5,3 +5,7 @@ class ApiConfig(AppConfig):
     name = 'api'
     verbose_name = "TODOService API"
 
+    def ready(self):
+        # connect the User counter signal handlers
+        import api.signals
+
@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+class Command(BaseCommand):
+    """
+    Compare the per-request cost of the browser and API middleware stacks
+    for a client that sends both a session cookie and a token, using the
+    configured SESSION_ENGINE.
+
+    Runs against a throwaway test database, like `manage.py test`, so
+    nothing is written to the configured database.
+
+    Usage:
+
+        python manage.py measure_sessions --requests 1000 --rounds 7
+    """
+
+    help = 'Measure per-request time and queries for each middleware stack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--rounds', type=int, default=7)
+
+    def handle(self, *args, **options):
+        # the test client uses the 'testserver' host
+        settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ['testserver']
+
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        try:
+            self.measure_stacks(options)
+        finally:
+            runner.teardown_databases(old_config)
+
+    def measure_stacks(self, options):
+        user = User.objects.create_user(
+            username="bench", password="password", email="bench@soap.com")
+        token = Token.objects.create(user=user)
+        path = '/users/{}/' . format(user.pk)
+
+        stacks = [
+            ('browser', settings.BROWSER_MIDDLEWARE_CLASSES),
+            ('api', settings.API_MIDDLEWARE_CLASSES),
+        ]
+
+        self.stdout.write('SESSION_ENGINE: {}' . format(settings.SESSION_ENGINE))
+        self.stdout.write('GET {}, median of {} x {} requests' . format(
+            path, options['rounds'], options['requests']))
+        self.stdout.write('{:<10}{:>14}{:>16}' . format(
+            'stack', 'ms/request', 'queries/request'))
+
+        for name, middleware in stacks:
+            with override_settings(MIDDLEWARE_CLASSES=middleware):
+                client = APIClient()
+                client.login(username="bench", password="password")
+                client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
+                elapsed, queries = self.measure(client, path, options)
+
+            self.stdout.write('{:<10}{:>14.3f}{:>16.2f}' . format(
+                name, elapsed * 1000, queries))
+
+    def measure(self, client, path, options):
+        num_requests = options['requests']
+
+        # warm up url resolving, template loading etc.
+        client.get(path)
+
+        timings = []
+        for i in range(options['rounds']):
+            # the query log only keeps the last 9000 queries
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.time()
+                for j in range(num_requests):
+                    client.get(path)
+                timings.append(time.time() - start)
+
+        median = sorted(timings)[len(timings) // 2]
+        return median / num_requests, len(queries) / float(num_requests)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.models import UserStats
+
+
+class Command(BaseCommand):
+    """
+    Recompute the /users/stats/ counters from COUNT(*) on the User table.
+    Schedule this periodically, e.g. hourly from cron:
+
+        0 * * * * python manage.py reconcile_user_stats
+    """
+
+    help = 'Reconcile the incrementally maintained user counters'
+
+    def handle(self, *args, **options):
+        before = UserStats.summary()
+        UserStats.reconcile()
+        after = UserStats.summary()
+
+        for name in ('users', 'staff', 'recently_joined'):
+            self.stdout.write('{}: {} -> {}' . format(
+                name, before[name], after[name]))
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+
+
+def is_sessionless(request):
+    """
+    A request is served without a session if it sends its own credentials
+    in the Authorization header (token or basic auth) and is not for one of
+    the browser routes in SESSION_URL_PREFIXES. Any session cookie it also
+    carries is ignored, so DRF authenticates it from the header alone.
+    """
+    if 'HTTP_AUTHORIZATION' not in request.META:
+        return False
+
+    return not request.path_info.startswith(
+        tuple(settings.SESSION_URL_PREFIXES))
+
+
+class APISessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware that does not attach a session to sessionless requests.
+    Must come before the other API* middleware.
+    """
+
+    def process_request(self, request):
+        request.sessionless = is_sessionless(request)
+        if request.sessionless:
+            return
+
+        super(APISessionMiddleware, self).process_request(request)
+
+    def process_response(self, request, response):
+        if getattr(request, 'sessionless', False):
+            return response
+
+        return super(APISessionMiddleware, self).process_response(
+            request, response)
+
+
+class APIAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Sessionless requests are anonymous until DRF authenticates them.
+    """
+
+    def process_request(self, request):
+        if getattr(request, 'sessionless', False):
+            request.user = AnonymousUser()
+            return
+
+        super(APIAuthenticationMiddleware, self).process_request(request)
+
+
+class APIMessageMiddleware(MessageMiddleware):
+    """
+    Messages are stored in the session, so skip them for sessionless requests.
+    """
+
+    def process_request(self, request):
+        if getattr(request, 'sessionless', False):
+            return
+
+        super(APIMessageMiddleware, self).process_request(request)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# api.models.RECENT_DAYS at the time of this migration
+RECENT_DAYS = 30
+
+
+def seed_user_stats(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    UserStats = apps.get_model('api', 'UserStats')
+    DailyJoinCount = apps.get_model('api', 'DailyJoinCount')
+
+    UserStats.objects.create(
+        pk=1,
+        users=User.objects.count(),
+        staff=User.objects.filter(is_staff=True).count(),
+    )
+
+    counts = {}
+    joined = User.objects.filter(
+        date_joined__gte=timezone.now() - timedelta(days=RECENT_DAYS))
+    for date_joined in joined.values_list('date_joined', flat=True):
+        if timezone.is_aware(date_joined):
+            date_joined = timezone.localtime(date_joined)
+        day = date_joined.date()
+        counts[day] = counts.get(day, 0) + 1
+
+    DailyJoinCount.objects.bulk_create([
+        DailyJoinCount(day=day, count=count) for day, count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0007_alter_validators_add_error_messages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyJoinCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('users', models.IntegerField(default=0)),
+                ('staff', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_user_stats, migrations.RunPython.noop),
+    ]
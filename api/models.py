@@ -1,3 +1,117 @@
-from django.db import models
+from datetime import timedelta
 
-# Create your models here.
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+# Users that joined in this many days count as "recently joined"
+RECENT_DAYS = 30
+
+
+class UserStats(models.Model):
+    """
+    Totals for the User table, maintained incrementally by the signal
+    handlers in api.signals. There is only ever one row (pk=1).
+    Run `python manage.py reconcile_user_stats` periodically to correct
+    any drift, e.g. from queryset.update() or bulk_create(), or from two
+    saves of the same user changing is_staff concurrently outside a
+    transaction (requests are atomic, see ATOMIC_REQUESTS).
+    """
+
+    users = models.IntegerField(default=0)
+    staff = models.IntegerField(default=0)
+
+    class Meta:
+        # models.py is imported even when the api app is not installed
+        app_label = 'api'
+
+    @classmethod
+    def increment(cls, **deltas):
+        """Atomically add deltas to the counters, e.g. increment(users=1)"""
+        updates = dict((name, F(name) + delta) for name, delta in deltas.items())
+        updated = cls.objects.filter(pk=1).update(**updates)
+        if not updated:
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(**updates)
+
+    @classmethod
+    def summary(cls, days=RECENT_DAYS):
+        stats, created = cls.objects.get_or_create(pk=1)
+        return {
+            "users": stats.users,
+            "staff": stats.staff,
+            "recently_joined": DailyJoinCount.recent(days),
+            "recent_days": days,
+        }
+
+    @classmethod
+    def reconcile(cls, days=RECENT_DAYS):
+        """Recompute all counters from COUNT(*) on the User table"""
+        with transaction.atomic():
+            cls.objects.get_or_create(pk=1)
+            # Lock the row before counting: concurrent increments wait for
+            # the recount to commit instead of being overwritten by it.
+            stats = cls.objects.select_for_update().get(pk=1)
+            stats.users = User.objects.count()
+            stats.staff = User.objects.filter(is_staff=True).count()
+            stats.save()
+
+            DailyJoinCount.reconcile(days)
+
+
+class DailyJoinCount(models.Model):
+    """
+    Number of users that joined on a given day. Summing the last few rows
+    gives the recently joined count without scanning the User table.
+    """
+
+    day = models.DateField(unique=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        app_label = 'api'
+
+    @classmethod
+    def increment(cls, day, delta):
+        updated = cls.objects.filter(day=day).update(count=F('count') + delta)
+        if not updated and delta > 0:
+            cls.objects.get_or_create(day=day)
+            cls.objects.filter(day=day).update(count=F('count') + delta)
+
+    @classmethod
+    def recent(cls, days=RECENT_DAYS):
+        since = local_date(timezone.now()) - timedelta(days=days - 1)
+        total = cls.objects.filter(day__gte=since).aggregate(total=Sum('count'))
+        return total['total'] or 0
+
+    @classmethod
+    def reconcile(cls, days=RECENT_DAYS):
+        today = local_date(timezone.now())
+        since = today - timedelta(days=days - 1)
+
+        # block increments to the existing buckets until the recount commits
+        list(cls.objects.select_for_update().filter(day__gte=since))
+
+        counts = {}
+        joined = User.objects.filter(
+            date_joined__gte=timezone.now() - timedelta(days=days))
+        for date_joined in joined.values_list('date_joined', flat=True):
+            day = local_date(date_joined)
+            counts[day] = counts.get(day, 0) + 1
+
+        for offset in range(days):
+            day = since + timedelta(days=offset)
+            cls.objects.update_or_create(
+                day=day, defaults={"count": counts.get(day, 0)})
+
+        # older buckets are never read again by the stats endpoint
+        keep_since = today - timedelta(days=max(days, RECENT_DAYS) - 1)
+        cls.objects.filter(day__lt=keep_since).delete()
+
+
+def local_date(value):
+    """The date of a datetime in the current time zone (TIME_ZONE)"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
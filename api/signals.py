@@ -0,0 +1,44 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from api.models import DailyJoinCount, UserStats, local_date
+
+
+@receiver(pre_save, sender=User)
+def read_stored_is_staff(sender, instance, raw=False, using=None,
+                         update_fields=None, **kwargs):
+    instance._stats_was_staff = None
+    if raw or instance.pk is None:
+        return
+
+    if update_fields is not None and 'is_staff' not in update_fields:
+        return
+
+    users = User.objects.using(using).filter(pk=instance.pk)
+    if transaction.get_connection(using).in_atomic_block:
+        # Hold the row until the save commits, so a concurrent save of the
+        # same user reads the new value and doesn't count the change again.
+        users = users.select_for_update()
+
+    instance._stats_was_staff = users.values_list('is_staff', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def count_saved_user(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    was_staff = getattr(instance, '_stats_was_staff', None)
+    if created:
+        UserStats.increment(users=1, staff=int(bool(instance.is_staff)))
+        DailyJoinCount.increment(local_date(instance.date_joined), 1)
+    elif was_staff is not None and instance.is_staff != was_staff:
+        UserStats.increment(staff=1 if instance.is_staff else -1)
+
+
+@receiver(post_delete, sender=User)
+def count_deleted_user(sender, instance, **kwargs):
+    UserStats.increment(users=-1, staff=-int(bool(instance.is_staff)))
+    DailyJoinCount.increment(local_date(instance.date_joined), -1)
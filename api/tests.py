@@ -1,10 +1,18 @@
-from django.test import TestCase, Client
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User, AnonymousUser
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
-from django.db import DatabaseError
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from django.utils.six import StringIO
 import json
 from mock import patch
 from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from api.models import UserStats, DailyJoinCount
 
 class HealthTestCase(TestCase):
     def setUp(self):
@@ -299,3 +307,211 @@ class SwaggerLoginRedirect(TestCase):
         assert response.status_code == 200, \
           'Expect a logged-in user to be able to view the explorer. Got: {}' . format (response.status_code)
 
+
+@override_settings(MIDDLEWARE_CLASSES=settings.API_MIDDLEWARE_CLASSES)
+class SessionlessAPITestCase(TestCase):
+
+    def setUp(self):
+        self.c = APIClient()
+        self.normal_user = User.objects.create_user(
+            username="joe", password="password", email="joe@soap.com")
+        self.token = Token.objects.create(user=self.normal_user)
+
+    def test_token_request_does_not_get_a_session(self):
+        """Token requests to API routes skip the session, even with a cookie"""
+
+        self.c.login(username="joe", password="password")
+        self.c.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        response = self.c.get(reverse("user-list"))
+
+        assert response.status_code == 200, \
+            "Expect 200 OK. got: {}" . format (response.status_code)
+        assert not hasattr(response.wsgi_request, "session"), \
+            "Expect no session on a token authenticated request"
+
+    def test_token_request_skips_session_queries(self):
+        """A token request costs 1 query to authenticate, a session request 2"""
+
+        url = reverse("user-detail", args=[self.normal_user.pk])
+        self.c.login(username="joe", password="password")
+        self.c.get(url)
+
+        # session row + user, then the user detail
+        assert self.count_selects(url) == 3, \
+            "Expect 3 queries for a session request"
+
+        # token joined with user, then the user detail
+        self.c.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        assert self.count_selects(url) == 2, \
+            "Expect 2 queries for a token request"
+
+    def count_selects(self, url):
+        # ignore the savepoints ATOMIC_REQUESTS adds
+        with CaptureQueriesContext(connection) as queries:
+            self.c.get(url)
+        return len([query for query in queries
+                    if query["sql"].startswith("SELECT")])
+
+    def test_invalid_token_does_not_fall_back_to_session(self):
+
+        self.c.login(username="joe", password="password")
+        self.c.credentials(HTTP_AUTHORIZATION="Token invalid")
+        response = self.c.get(reverse("user-list"))
+
+        assert response.status_code in (401, 403), \
+            "Expect the request to be rejected. got: {}" . format (response.status_code)
+
+    def test_logged_in_user_still_uses_session(self):
+        """A request without an Authorization header uses the session as before"""
+
+        self.c.login(username="joe", password="password")
+        response = self.c.get(reverse("user-list"))
+
+        assert response.status_code == 200, \
+            "Expect 200 OK. got: {}" . format (response.status_code)
+        assert hasattr(response.wsgi_request, "session"), \
+            "Expect a session when no Authorization header is sent"
+
+    def test_password_change_invalidates_session(self):
+        """The session hash is still verified with the API stack"""
+
+        self.c.login(username="joe", password="password")
+        self.normal_user.set_password("newpassword")
+        self.normal_user.save()
+
+        response = self.c.get(reverse("user-list"))
+
+        assert response.status_code == 403, \
+            "Expect 403 after a password change. got: {}" . format (response.status_code)
+
+    def test_browser_routes_always_get_a_session(self):
+        """The login page needs a session even with an Authorization header"""
+
+        self.c.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        response = self.c.get("/api-auth/login/")
+
+        assert hasattr(response.wsgi_request, "session"), \
+            "Expect a session on browser routes"
+
+class UserStatsTestCase(TestCase):
+
+    def setUp(self):
+        self.c = APIClient()
+
+        self.normal_user = User.objects.create_user(
+            username="joe", password="password", email="joe@soap.com")
+        self.superuser = User.objects.create_superuser(
+            username="clark", password="supersecret", email="joe@soap.com")
+
+    def get_stats(self):
+        self.c.login(username="joe", password="password")
+        response = self.c.get(reverse("user-stats"))
+
+        assert response.status_code == 200, \
+            "Expect 200 OK. got: {}" . format(response.status_code)
+        return response.json()
+
+    def test_stats_requires_login(self):
+        """GET /users/stats/ returns 403 for non-loggedin user"""
+
+        response = self.c.get(reverse("user-stats"))
+
+        assert response.status_code == 403, \
+            "Expect 403. got: {}" . format(response.status_code)
+
+    def test_stats_counts_users(self):
+        """GET /users/stats/ returns totals for users, staff and recent joins"""
+
+        stats = self.get_stats()
+
+        assert stats["users"] == 2, \
+            'Expect 2 users. Got: {}' . format (stats["users"])
+        assert stats["staff"] == 1, \
+            'Expect 1 staff user. Got: {}' . format (stats["staff"])
+        assert stats["recently_joined"] == 2, \
+            'Expect 2 recently joined. Got: {}' . format (stats["recently_joined"])
+
+    def test_stats_do_not_count_user_table(self):
+        """Stats are served from the counters, not COUNT(*) on auth_user"""
+
+        self.c.login(username="joe", password="password")
+        url = reverse("user-stats")
+        self.c.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.c.get(url)
+
+        counts = [query["sql"] for query in queries
+                  if "COUNT" in query["sql"].upper() and "auth_user" in query["sql"]]
+        assert not counts, \
+            'Expect no COUNT on auth_user. Got: {}' . format (counts)
+
+    def test_reconcile_keeps_buckets_read_by_stats(self):
+        """Buckets inside RECENT_DAYS survive reconciliation"""
+
+        User.objects.filter(pk=self.normal_user.pk).update(
+            date_joined=timezone.now() - timedelta(days=10))
+        call_command("reconcile_user_stats", stdout=StringIO())
+
+        stats = UserStats.summary()
+        assert stats["recently_joined"] == 2, \
+            'Expect 2 recently joined. Got: {}' . format (stats["recently_joined"])
+
+    def test_stats_follow_staff_changes_and_deletes(self):
+
+        self.normal_user.is_staff = True
+        self.normal_user.save()
+        assert UserStats.summary()["staff"] == 2, \
+            'Expect promoted user to be counted as staff'
+
+        self.superuser.delete()
+        stats = UserStats.summary()
+        assert stats["users"] == 1, \
+            'Expect 1 user after delete. Got: {}' . format (stats["users"])
+        assert stats["staff"] == 1, \
+            'Expect 1 staff user after delete. Got: {}' . format (stats["staff"])
+        assert stats["recently_joined"] == 1, \
+            'Expect 1 recently joined after delete. Got: {}' . format (stats["recently_joined"])
+
+    def test_stale_instances_promote_staff_once(self):
+        """Two copies of a user both promoting it count one new staff user"""
+
+        first = User.objects.get(pk=self.normal_user.pk)
+        second = User.objects.get(pk=self.normal_user.pk)
+
+        first.is_staff = True
+        first.save()
+        second.is_staff = True
+        second.save()
+
+        staff = UserStats.summary()["staff"]
+        assert staff == 2, \
+            'Expect 2 staff users. Got: {}' . format (staff)
+
+    def test_recent_buckets_use_local_date(self):
+        """The recent window starts at the local date, like the buckets"""
+
+        # 2016-01-01 05:00 UTC is still 2015-12-31 in Pago Pago (UTC-11)
+        now = timezone.make_aware(datetime(2016, 1, 1, 5), timezone.utc)
+        with override_settings(TIME_ZONE="Pacific/Pago_Pago"), \
+                patch("django.utils.timezone.now", return_value=now):
+            before = DailyJoinCount.recent(1)
+            User.objects.create_user(
+                username="late", password="password", date_joined=now)
+
+            assert DailyJoinCount.recent(1) == before + 1, \
+                'Expect the user who joined today (local time) to be counted'
+
+    def test_reconcile_fixes_drift(self):
+        """reconcile_user_stats recomputes counters from the User table"""
+
+        # queryset.update() does not send signals
+        User.objects.filter(pk=self.normal_user.pk).update(
+            is_staff=True, date_joined=timezone.now() - timedelta(days=365))
+        UserStats.objects.filter(pk=1).update(users=100)
+
+        call_command("reconcile_user_stats", stdout=StringIO())
+
+        stats = UserStats.summary()
+        assert stats == {"users": 2, "staff": 2, "recently_joined": 1, "recent_days": 30}, \
+            'Expect counters to match the User table. Got: {}' . format (stats)
@@ -61,6 +61,43 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         return super(UserViewSet, self).list(request, *args, **kwargs)
 
+    @decorators.list_route(methods=['get'])
+    def stats(self, request, *args, **kwargs):
+        """
+        Aggregate user statistics.
+
+        **Notes:**
+
+        * Requires authenticated user
+        * Served from counters maintained on User save/delete,
+          so it does not read the users table
+
+        **Example usage:**
+
+            import requests
+            response = requests.get('/users/stats/')
+
+        **Example response:**
+
+            {
+              "users": 120,
+              "staff": 4,
+              "recently_joined": 17,
+              "recent_days": 30
+            }
+
+        ---
+        responseMessages:
+        - code: 403
+          message: Not authenticated
+
+        produces:
+            - application/json
+        """
+        # imported here: the api app (and its tables) only exist with WITH_DOCKER
+        from api.models import UserStats
+        return response.Response(UserStats.summary())
+
 class HealthViewSet(viewsets.ViewSet):
 
     permission_classes = (AllowAny, )
@@ -4,8 +4,19 @@ Never edit settings.py directly
 """
 
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 import os
 
+# the production profile (docker-compose.yml `prod`) sets DEBUG=False
+DEBUG = os.environ.get('DEBUG', 'True') == 'True'
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]
+
+# settings.py's SECRET_KEY is public; never use it without DEBUG
+if 'SECRET_KEY' in os.environ:
+    SECRET_KEY = os.environ['SECRET_KEY']
+elif not DEBUG:
+    raise ImproperlyConfigured('Set SECRET_KEY when DEBUG is False.')
+
 # connect to the linked docker postgres db
 DATABASES = {
     'default': {
@@ -14,6 +25,8 @@ DATABASES = {
         'USER': 'postgres',
         'HOST': 'db',
         'PORT': 5432,
+        # keeps the /users/stats/ counters in step with the user rows
+        'ATOMIC_REQUESTS': True,
     }
 }
 
@@ -22,6 +35,7 @@ DATABASES = {
 # just add here (or use app.py)
 settings.INSTALLED_APPS.extend([
     'rest_framework',
+    'rest_framework.authtoken',
     'rest_framework_swagger',
     'api',
 ])
@@ -32,9 +46,76 @@ REST_FRAMEWORK = {
     # or allow read-only access for unauthenticated users.
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.DjangoModelPermissions'
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+        'rest_framework.authentication.TokenAuthentication',
     ]
 }
 
+# Sessions
+# https://docs.djangoproject.com/en/1.9/topics/http/sessions/#configuring-the-session-engine
+#
+# Set SESSION_ENGINE in the environment to avoid a DB round trip per request:
+#   django.contrib.sessions.backends.db (default)
+#   django.contrib.sessions.backends.cached_db
+#   django.contrib.sessions.backends.cache
+#   django.contrib.sessions.backends.signed_cookies
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+
+# The cache backed engines need a cache shared by all gunicorn workers.
+# Django's default local-memory cache is per process: a login on one
+# worker would be missing on the others.
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': os.environ['MEMCACHED_LOCATION'],
+        }
+    }
+elif SESSION_ENGINE in ('django.contrib.sessions.backends.cache',
+                        'django.contrib.sessions.backends.cached_db'):
+    raise ImproperlyConfigured(
+        'SESSION_ENGINE {} needs a shared cache. '
+        'Set MEMCACHED_LOCATION (e.g. cache:11211).' . format(SESSION_ENGINE))
+
+# Same stack as MIDDLEWARE_CLASSES, but requests to non-browser routes that
+# authenticate themselves (e.g. `Authorization: Token ...`) skip the session
+# read, session user lookup and session save, even if they also send a
+# session cookie. See api/middleware.py
+# SessionAuthenticationMiddleware must stay listed: auth.get_user() only
+# verifies the session hash (logout on password change) if it is present.
+API_MIDDLEWARE_CLASSES = [
+    'django.middleware.security.SecurityMiddleware',
+    'api.middleware.APISessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'api.middleware.APIAuthenticationMiddleware',
+    'django.contrib.auth.middleware.SessionAuthenticationMiddleware',
+    'api.middleware.APIMessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Routes that always get a session (login pages, admin, swagger explorer)
+SESSION_URL_PREFIXES = ['/admin/', '/api-auth/', '/explorer/']
+
+# settings.py's stack, kept for `python manage.py measure_sessions`
+BROWSER_MIDDLEWARE_CLASSES = settings.MIDDLEWARE_CLASSES
+
+SESSIONLESS_API = os.environ.get('SESSIONLESS_API', 'False') == 'True'
+if SESSIONLESS_API:
+    MIDDLEWARE_CLASSES = API_MIDDLEWARE_CLASSES
+
+# Without DEBUG, urls.py no longer serves /static/, so let WhiteNoise serve
+# the collected files (swagger explorer, API login page) from gunicorn.
+if not DEBUG:
+    MIDDLEWARE_CLASSES = list(
+        API_MIDDLEWARE_CLASSES if SESSIONLESS_API else settings.MIDDLEWARE_CLASSES)
+    # right after SecurityMiddleware
+    MIDDLEWARE_CLASSES.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+
 SWAGGER_SETTINGS = {
     'is_authenticated': True,
     'permission_denied_handler': 'api.permissions.swagger_permission_denied_handler',
@@ -0,0 +1,79 @@
+"""
+Production gunicorn configuration for todoapi.
+
+Usage:
+
+    gunicorn todoapi.wsgi:application -c todoapi/gunicorn_conf.py
+
+Every value can be overridden from the environment, e.g.
+GUNICORN_WORKERS=4 GUNICORN_WORKER_CLASS=gevent.
+
+With preload_app the master imports Django once and the workers share
+those pages copy-on-write. RSS counts shared pages in every process, so
+compare setups by PSS (Pss in /proc/<pid>/smaps_rollup), not RSS.
+"""
+
+import multiprocessing
+import os
+
+
+def env(name, default):
+    return os.environ.get('GUNICORN_' + name, default)
+
+
+bind = env('BIND', ':8000')
+
+# "sync", "gthread" (threads per worker) or "gevent" (needs gevent installed,
+# and psycogreen to make psycopg2 cooperative)
+worker_class = env('WORKER_CLASS', 'gthread')
+
+# (2 x cores) + 1 processes is the usual starting point for the sync worker.
+# Threaded and async workers handle concurrency themselves, so use fewer.
+cores = multiprocessing.cpu_count()
+if worker_class == 'sync':
+    workers = int(env('WORKERS', cores * 2 + 1))
+else:
+    workers = int(env('WORKERS', cores + 1))
+
+# only used by gthread. Gunicorn switches sync workers to gthread when
+# threads > 1, so keep it at 1 for the other worker classes.
+if worker_class == 'gthread':
+    threads = int(env('THREADS', 4))
+else:
+    threads = 1
+
+# only used by gevent
+worker_connections = int(env('WORKER_CONNECTIONS', 1000))
+
+# Import the app in the master before forking so workers share memory
+# copy-on-write and start faster. Incompatible with --reload.
+# Never preload with gevent: the master would import Django before the
+# worker monkey-patches threading, so all greenlets in a worker would
+# share one thread-local database connection.
+if worker_class == 'gevent':
+    preload_app = False
+else:
+    preload_app = env('PRELOAD_APP', 'True') == 'True'
+
+# Recycle workers to bound memory growth. The jitter staggers restarts so
+# the workers are not all recycled at the same time.
+max_requests = int(env('MAX_REQUESTS', 1000))
+max_requests_jitter = int(env('MAX_REQUESTS_JITTER', 100))
+
+timeout = int(env('TIMEOUT', 30))
+graceful_timeout = int(env('GRACEFUL_TIMEOUT', 30))
+keepalive = int(env('KEEPALIVE', 2))
+
+accesslog = env('ACCESSLOG', '-')
+errorlog = env('ERRORLOG', '-')
+
+
+def pre_fork(server, worker):
+    if not preload_app:
+        return
+
+    # Close any database connection the master opened while preloading the
+    # app, so no worker inherits (and shares) its socket.
+    from django.db import connections
+    for connection in connections.all():
+        connection.close()
@@ -1,6 +1,7 @@
 from django.conf.urls import url, include
 from django.contrib import admin
 from api.views import router
+from rest_framework.authtoken.views import obtain_auth_token
 
 from django.conf import settings
 from django.conf.urls.static import static
@@ -13,7 +14,8 @@ urlpatterns = [
     url(r'^explorer/', 
     	include('rest_framework_swagger.urls', namespace='swagger')),
     url(r'^api-auth/',
-        include('rest_framework.urls', namespace='rest_framework'))
+        include('rest_framework.urls', namespace='rest_framework')),
+    url(r'^api-token-auth/', obtain_auth_token),
 
 ]
 